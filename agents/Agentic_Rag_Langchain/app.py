@@ -1,45 +1,88 @@
 import streamlit as st
-from typing import List, Dict, Any
+import httpx
+from openai import APITimeoutError
+from typing import Annotated, List, Dict, Any
 from typing_extensions import TypedDict
 from datetime import datetime, timedelta
 from dateutil import parser as date_parser
 import feedparser
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+from lxml import etree
 from langchain_openai import OpenAIEmbeddings, ChatOpenAI
 from langchain_qdrant import QdrantVectorStore
 from qdrant_client import QdrantClient
-from uuid import uuid4
-from langchain_core.prompts import PromptTemplate
+from qdrant_client.models import FieldCondition, Filter, MatchAny, MatchValue, PointStruct
+from uuid import UUID, uuid4
+from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 from pydantic import BaseModel, Field
+from sklearn.cluster import AgglomerativeClustering
+from datasketch import MinHash, MinHashLSH
+import numpy as np
 from langgraph.graph import END, StateGraph, START
-import json
+from langgraph.types import Send
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from io import BytesIO
+from urllib.parse import urlsplit
+import operator
+import hashlib
+import tiktoken
+import orjson
+import random
+import re
+import threading
 import time
 import os
+import queue
 
 # Debug logging helper (writes NDJSON lines to a fixed path)
+DEBUG_LOG_PATH = "/Users/srilaxmich/Desktop/Generative-AI-Projects/.cursor/debug.log"
+DEBUG_LOG_BATCH_SIZE = 64  # Records appended per file write
+
+def write_debug_log_batches(records: queue.Queue):
+    """Drain queued debug records and append them to the log file in batches. Runs forever on a daemon thread."""
+    while True:
+        batch = [records.get()]
+        while len(batch) < DEBUG_LOG_BATCH_SIZE:
+            try:
+                batch.append(records.get_nowait())
+            except queue.Empty:
+                break
+        try:
+            os.makedirs(os.path.dirname(DEBUG_LOG_PATH), exist_ok=True)
+            with open(DEBUG_LOG_PATH, "ab") as f:
+                f.write(b"".join(orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE) for record in batch))
+        except Exception:
+            # Avoid breaking the app if logging fails
+            pass
+
+@st.cache_resource(show_spinner=False)
+def get_debug_log_queue() -> queue.Queue:
+    """Queue feeding a single background log writer, shared across reruns."""
+    records = queue.Queue()
+    threading.Thread(target=write_debug_log_batches, args=(records,), daemon=True, name="debug-log-writer").start()
+    return records
+
 def debug_log(session_id, run_id, hypothesis_id, location, message, data):
-    log_path = "/Users/srilaxmich/Desktop/Generative-AI-Projects/.cursor/debug.log"
-    try:
-        os.makedirs(os.path.dirname(log_path), exist_ok=True)
-        with open(log_path, "a") as f:
-            f.write(json.dumps({
-                "sessionId": session_id,
-                "runId": run_id,
-                "hypothesisId": hypothesis_id,
-                "location": location,
-                "message": message,
-                "data": data,
-                "timestamp": int(time.time() * 1000)
-            }) + "\n")
-    except Exception:
-        # Avoid breaking the app if logging fails
-        pass
+    """Queue one debug record; the file write happens on the background writer thread."""
+    DEBUG_LOG_QUEUE.put_nowait({
+        "sessionId": session_id,
+        "runId": run_id,
+        "hypothesisId": hypothesis_id,
+        "location": location,
+        "message": message,
+        "data": data,
+        "timestamp": int(time.time() * 1000)
+    })
 
 st.set_page_config(page_title="Newsletter Pipeline", page_icon="📰")
 st.header(":blue[Multi-Agent Newsletter Pipeline] :green[with LangGraph]")
 
+DEBUG_LOG_QUEUE = get_debug_log_queue()
+
 # Configuration
 SOURCES_ALLOWLIST = [
     "https://www.news.aakashg.com/",
@@ -48,6 +91,28 @@ SOURCES_ALLOWLIST = [
     "https://www.lennysnewsletter.com/",
     "https://ruben.substack.com/",
 ]
+CHAT_MODEL = "gpt-4o-mini"
+EMBEDDING_MODEL = "text-embedding-3-small"
+EMBEDDING_DIM = 512  # Shortened text-embedding-3-small vectors (native size 1536)
+FETCH_TIMEOUT_SECONDS = 10  # Per-request timeout, and total budget for a source's RSS probes
+FETCH_CACHE_TTL_SECONDS = 15 * 60  # How long fetched posts are reused across reruns
+SCRAPE_MAX_BYTES = 512 * 1024  # Scraped pages are cut off here; the article list is near the top
+EMBED_BATCH_SIZE = 512  # Texts per embeddings request (the API accepts up to 2048)
+EMBED_MAX_WORKERS = 4  # Concurrent embeddings requests
+EMBED_REQUESTS_PER_MINUTE = 60  # Rate limit for embeddings requests
+EMBEDDING_CACHE_SIZE = 4096  # In-process embedding cache entries
+QDRANT_UPSERT_BATCH_SIZE = 256  # Points per Qdrant upsert request
+CLUSTER_DISTANCE_THRESHOLD = 0.3  # Max average cosine distance within a semantic cluster
+DRAFT_CACHE_COLLECTION = "draft_cache"
+DRAFT_CACHE_THRESHOLD = 0.95  # Min cosine similarity to reuse a cached draft
+DRAFT_CACHE_TTL_SECONDS = 24 * 3600
+DRAFT_EXACT_CACHE_SIZE = 256  # In-process drafts kept for exact-input reuse
+ANALYSIS_CACHE_COLLECTION = "analysis_cache"
+ANALYSIS_CACHE_TTL_SECONDS = 24 * 3600
+NEIGHBOR_K = 5  # Nearest neighbors listed per post in the analysis prompt
+DEDUP_JACCARD_THRESHOLD = 0.8  # Posts whose word sets overlap this much are treated as one
+DEDUP_NUM_PERM = 64  # MinHash permutations per post
+ANALYSIS_TOKEN_BUDGET = 6000  # Max prompt tokens spent on posts in the analysis call
 
 # Initialize session state
 if 'qdrant_host' not in st.session_state:
@@ -93,13 +158,31 @@ def set_sidebar():
             "use_embeddings": use_embeddings_config
         }
 
-def initialize_components():
+@st.cache_resource(show_spinner=False)
+def get_chat_model(api_key: str) -> ChatOpenAI:
+    """Chat model client, created once per API key and shared across reruns and agents."""
+    return ChatOpenAI(
+        api_key=api_key,
+        temperature=0,
+        model=CHAT_MODEL
+    )
+
+@st.cache_resource(show_spinner=False)
+def get_embedding_model(api_key: str) -> OpenAIEmbeddings:
+    """Embedding model client, created once per API key and shared across reruns."""
+    return OpenAIEmbeddings(
+        model=EMBEDDING_MODEL,
+        dimensions=EMBEDDING_DIM,
+        openai_api_key=api_key
+    )
+
+@st.cache_resource(show_spinner=False)
+def initialize_components(qdrant_host: str, qdrant_api_key: str, openai_api_key: str, use_embeddings_config: bool = True):
     """Initialize components that require API keys.
+    Cached per configuration, so clients are created once per worker instead of on every rerun.
     Returns: (embedding_model, client, db) or (None, client, None) if embeddings fail.
     Embeddings are optional - app can work without them."""
-    if not all([st.session_state.qdrant_host, 
-               st.session_state.qdrant_api_key, 
-               st.session_state.openai_api_key]):
+    if not all([qdrant_host, qdrant_api_key, openai_api_key]):
         return None, None, None
 
     embedding_model = None
@@ -108,8 +191,10 @@ def initialize_components():
     # Initialize Qdrant client first (required)
     try:
         client = QdrantClient(
-            url=st.session_state.qdrant_host,
-            api_key=st.session_state.qdrant_api_key if st.session_state.qdrant_api_key else None,
+            url=qdrant_host,
+            api_key=qdrant_api_key if qdrant_api_key else None,
+            prefer_grpc=True,
+            grpc_port=6334,
             timeout=30
         )
     except Exception as client_error:
@@ -117,18 +202,12 @@ def initialize_components():
         return None, None, None
 
     # Try to initialize embedding model (optional - app can work without it)
-    # Check if embeddings are enabled in config
-    use_embeddings_config = st.session_state.get("config", {}).get("use_embeddings", True)
-    
     if not use_embeddings_config:
         st.info("ℹ️ Embeddings disabled in configuration. Running in LLM-only mode.")
         embedding_model = None
     else:
         try:
-            embedding_model = OpenAIEmbeddings(
-                model="text-embedding-3-small",
-                openai_api_key=st.session_state.openai_api_key
-            )
+            embedding_model = get_embedding_model(openai_api_key)
             st.success("✅ Embedding model initialized")
         except Exception as embed_init_error:
             error_str = str(embed_init_error)
@@ -142,8 +221,11 @@ def initialize_components():
     # Initialize Qdrant collection (only if we have embedding model)
     if embedding_model:
         collection_name = "newsletter_db"
-        from qdrant_client.models import Distance, VectorParams
-        embedding_dim = 1536  # OpenAI text-embedding-3-small dimension
+        from qdrant_client.models import (
+            BinaryQuantization, BinaryQuantizationConfig, Distance, HnswConfigDiff, PayloadSchemaType, VectorParams,
+            VectorParamsDiff
+        )
+        embedding_dim = EMBEDDING_DIM
         collection_needs_recreation = False
 
         # Check existing collection and dimension
@@ -161,6 +243,27 @@ def initialize_components():
                     collection_needs_recreation = False
             else:
                 st.info("ℹ️ Qdrant collection already exists with correct dimensions")
+                if existing_collection.config.quantization_config is None:
+                    # Collections created before quantization was enabled: convert in place, no re-embedding needed
+                    try:
+                        client.update_collection(
+                            collection_name=collection_name,
+                            vectors_config={"": VectorParamsDiff(on_disk=True)},
+                            quantization_config=BinaryQuantization(binary=BinaryQuantizationConfig(always_ram=True)),
+                        )
+                        st.info("ℹ️ Enabled binary quantization on existing collection")
+                    except Exception as update_error:
+                        st.warning(f"⚠️ Could not enable quantization: {str(update_error)[:200]}")
+                if "metadata.content_hash" not in (existing_collection.payload_schema or {}):
+                    # Collections from before the embedding cache lack its lookup index (creating it is idempotent)
+                    try:
+                        client.create_payload_index(
+                            collection_name=collection_name,
+                            field_name="metadata.content_hash",
+                            field_schema=PayloadSchemaType.KEYWORD,
+                        )
+                    except Exception as index_error:
+                        st.warning(f"⚠️ Could not index cached embeddings: {str(index_error)[:200]}")
         except Exception:
             collection_needs_recreation = True
 
@@ -168,7 +271,17 @@ def initialize_components():
             try:
                 client.create_collection(
                     collection_name=collection_name,
-                    vectors_config=VectorParams(size=embedding_dim, distance=Distance.COSINE),
+                    # Full vectors live on disk; the 1-bit quantized copy stays in RAM for search
+                    vectors_config=VectorParams(size=embedding_dim, distance=Distance.COSINE, on_disk=True),
+                    hnsw_config=HnswConfigDiff(m=16, ef_construct=128),
+                    quantization_config=BinaryQuantization(binary=BinaryQuantizationConfig(always_ram=True)),
+                    on_disk_payload=True,
+                )
+                # Embedding cache lookups filter on this field; index it so they don't scan on-disk payloads
+                client.create_payload_index(
+                    collection_name=collection_name,
+                    field_name="metadata.content_hash",
+                    field_schema=PayloadSchemaType.KEYWORD,
                 )
                 st.success("✅ Qdrant collection created successfully")
             except Exception as create_error:
@@ -178,6 +291,12 @@ def initialize_components():
                 else:
                     st.warning(f"⚠️ Could not create collection: {error_msg[:200]}. Continuing without vector storage.")
 
+        try:
+            ensure_cache_collection(client, DRAFT_CACHE_COLLECTION, embedding_dim)
+            ensure_cache_collection(client, ANALYSIS_CACHE_COLLECTION, embedding_dim)
+        except Exception as cache_error:
+            st.warning(f"⚠️ Could not prepare response caches: {str(cache_error)[:200]}. Responses will not be cached.")
+
         # Initialize vector store (only if embedding model is available)
         if embedding_model:
             try:
@@ -193,8 +312,9 @@ def initialize_components():
     return embedding_model, client, db
 
 # State Definition
-class NewsletterState(TypedDict):
-    raw_posts: List[Dict[str, Any]]
+class NewsletterState(TypedDict, total=False):
+    # Appended to by the parallel per-source fetcher tasks
+    raw_posts: Annotated[List[Dict[str, Any]], operator.add]
     extracted_metadata: List[Dict[str, Any]]
     themes: List[Dict[str, Any]]
     ranked_topics: List[Dict[str, Any]]
@@ -203,81 +323,231 @@ class NewsletterState(TypedDict):
     config: Dict[str, Any]
 
 # Helper Functions for Fetching
-def try_rss_feed(url: str) -> List[Dict[str, Any]]:
-    """Try to fetch posts from RSS feed."""
+# One pooled session for all fetches so connections (and TLS handshakes) are reused across requests
+HTTP_SESSION = requests.Session()
+HTTP_SESSION.headers.update({'User-Agent': 'Mozilla/5.0'})
+HTTP_SESSION.mount("https://", requests.adapters.HTTPAdapter(pool_connections=len(SOURCES_ALLOWLIST), pool_maxsize=20))
+HTTP_SESSION.mount("http://", requests.adapters.HTTPAdapter(pool_connections=len(SOURCES_ALLOWLIST), pool_maxsize=20))
+
+HTTP_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "newsletter")
+
+def http_cache_paths(url: str):
+    """(validators path, body path) of a URL's on-disk cache entry."""
+    base = os.path.join(HTTP_CACHE_DIR, hashlib.sha256(url.encode("utf-8")).hexdigest())
+    return base + ".json", base + ".body"
+
+def store_http_cache(url: str, response: requests.Response, body: bytes):
+    """Keep the body and its ETag / Last-Modified validators for conditional requests (best-effort)."""
+    validators = {"etag": response.headers.get("ETag"), "last_modified": response.headers.get("Last-Modified")}
+    if not any(validators.values()):
+        return
+    meta_path, body_path = http_cache_paths(url)
     try:
-        # Try common RSS feed URLs
-        rss_urls = [
-            url.rstrip('/') + '/feed',
-            url.rstrip('/') + '/rss',
-            url.rstrip('/') + '/feed.xml',
-            url.rstrip('/') + '/rss.xml',
-            url.rstrip('/') + '/atom.xml',
-        ]
-        
-        for rss_url in rss_urls:
-            try:
-                feed = feedparser.parse(rss_url)
-                if feed.entries:
-                    posts = []
-                    for entry in feed.entries:
-                        post = {
-                            "title": getattr(entry, 'title', 'Data Not Available'),
-                            "link": getattr(entry, 'link', url),
-                            "published": getattr(entry, 'published', 'Data Not Available'),
-                            "summary": getattr(entry, 'summary', getattr(entry, 'description', 'Data Not Available')),
-                            "author": getattr(entry, 'author', 'Data Not Available'),
-                            "source_url": url
-                        }
-                        posts.append(post)
-                    return posts
-            except:
-                continue
+        os.makedirs(HTTP_CACHE_DIR, exist_ok=True)
+        # Body first, each via rename, so the validators never point at a missing or partial body
+        for path, data in ((body_path, body), (meta_path, orjson.dumps(validators))):
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+def read_body(response: requests.Response, max_bytes: int = None) -> bytes:
+    """Response body, or only its first max_bytes (decompressed) when a cap is given."""
+    if max_bytes is None:
+        return response.content
+    body = bytearray()
+    for chunk in response.iter_content(chunk_size=64 * 1024):
+        body.extend(chunk)
+        if len(body) >= max_bytes:
+            break
+    return bytes(body[:max_bytes])
+
+def fetch_url(url: str, timeout: int = FETCH_TIMEOUT_SECONDS, max_bytes: int = None) -> bytes:
+    """GET a URL through the shared session and return the raw body (at most max_bytes if given).
+    Revalidates against the on-disk copy, so unchanged feeds and pages come back as a bodiless 304."""
+    meta_path, body_path = http_cache_paths(url)
+    headers = {}
+    try:
+        with open(meta_path, "rb") as f:
+            validators = orjson.loads(f.read())
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+    except (OSError, orjson.JSONDecodeError):
+        pass
+    # Stream capped downloads so the rest of a large page is never transferred
+    stream = max_bytes is not None
+    response = HTTP_SESSION.get(url, timeout=timeout, headers=headers, stream=stream)
+    if response.status_code == 304:
+        response.close()
+        try:
+            with open(body_path, "rb") as f:
+                return f.read()
+        except OSError:
+            # Cached body went missing: fetch it unconditionally
+            response = HTTP_SESSION.get(url, timeout=timeout, stream=stream)
+    with response:
+        response.raise_for_status()
+        body = read_body(response, max_bytes)
+    store_http_cache(url, response, body)
+    return body
+
+ATOM_NS = "{http://www.w3.org/2005/Atom}"
+DC_CREATOR = "{http://purl.org/dc/elements/1.1/}creator"
+# RSS 2.0 and Atom roots are parsed with lxml; anything else (RSS 1.0/RDF, HTML) goes to feedparser
+LXML_FEED_ROOT = re.compile(rb"<(?:rss|feed)[\s>]")
+
+def parse_feed_with_lxml(body: bytes, source_url: str) -> List[Dict[str, Any]]:
+    """Stream RSS 2.0 <item> / Atom <entry> elements into posts with lxml's C parser."""
+    posts = []
+    for _, entry in etree.iterparse(BytesIO(body), events=("end",), tag=("item", ATOM_NS + "entry"),
+                                    resolve_entities=False, no_network=True):
+        if entry.tag == "item":
+            post = {
+                "title": (entry.findtext("title") or "").strip() or 'Data Not Available',
+                "link": (entry.findtext("link") or "").strip() or source_url,
+                "published": entry.findtext("pubDate") or 'Data Not Available',
+                "summary": entry.findtext("description") or 'Data Not Available',
+                "author": entry.findtext("author") or entry.findtext(DC_CREATOR) or 'Data Not Available',
+            }
+        else:
+            link = next(
+                (el.get("href") for el in entry.iterfind(ATOM_NS + "link") if el.get("rel", "alternate") == "alternate"),
+                None
+            )
+            post = {
+                "title": (entry.findtext(ATOM_NS + "title") or "").strip() or 'Data Not Available',
+                "link": link or source_url,
+                "published": entry.findtext(ATOM_NS + "published") or entry.findtext(ATOM_NS + "updated") or 'Data Not Available',
+                "summary": entry.findtext(ATOM_NS + "summary") or entry.findtext(ATOM_NS + "content") or 'Data Not Available',
+                "author": entry.findtext(f"{ATOM_NS}author/{ATOM_NS}name") or 'Data Not Available',
+            }
+        post["source_url"] = source_url
+        posts.append(post)
+        # Drop the parsed subtree (and earlier siblings) so memory stays flat on large feeds
+        entry.clear()
+        while entry.getprevious() is not None:
+            del entry.getparent()[0]
+    return posts
+
+def parse_rss_feed(rss_url: str, source_url: str) -> List[Dict[str, Any]]:
+    """Parse a single candidate RSS feed URL into posts (empty list if none)."""
+    try:
+        # Download with a timeout, then parse the bytes (feedparser itself has no timeout)
+        body = fetch_url(rss_url)
+    except Exception:
         return []
-    except Exception as e:
+    if LXML_FEED_ROOT.search(body[:2048]):
+        try:
+            return parse_feed_with_lxml(body, source_url)
+        except etree.XMLSyntaxError:
+            pass  # Malformed XML: let feedparser's lenient parser have a go
+    try:
+        feed = feedparser.parse(body)
+    except Exception:
         return []
+    posts = []
+    for entry in feed.entries:
+        post = {
+            "title": getattr(entry, 'title', 'Data Not Available'),
+            "link": getattr(entry, 'link', source_url),
+            "published": getattr(entry, 'published', 'Data Not Available'),
+            "summary": getattr(entry, 'summary', getattr(entry, 'description', 'Data Not Available')),
+            "author": getattr(entry, 'author', 'Data Not Available'),
+            "source_url": source_url
+        }
+        posts.append(post)
+    return posts
 
-def scrape_web_page(url: str) -> List[Dict[str, Any]]:
-    """Fallback to web scraping if RSS fails."""
+RSS_FEED_SUFFIXES = ('/feed', '/rss', '/feed.xml', '/rss.xml', '/atom.xml')
+
+# Raw per-URL results are cached for a few minutes, so reruns (and time-window changes) skip the network.
+# Failures raise instead of returning [], because st.cache_data would otherwise keep an empty source for the whole TTL.
+@st.cache_data(ttl=FETCH_CACHE_TTL_SECONDS, show_spinner=False)
+def try_rss_feed(url: str) -> List[Dict[str, Any]]:
+    """Try to fetch posts from RSS feed. Raises LookupError if no candidate feed has posts."""
+    # Try common RSS feed URLs concurrently; the first non-empty feed wins
+    base_url = url.rstrip('/')
+    rss_urls = [base_url + suffix for suffix in RSS_FEED_SUFFIXES]
+    executor = ThreadPoolExecutor(max_workers=len(rss_urls))
     try:
-        response = requests.get(url, timeout=10, headers={'User-Agent': 'Mozilla/5.0'})
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        posts = []
-        # Try to find article/post links
-        article_links = soup.find_all(['article', 'div'], class_=lambda x: x and ('post' in x.lower() or 'article' in x.lower() or 'entry' in x.lower()), limit=10)
-        
-        for article in article_links[:10]:
-            title_elem = article.find(['h1', 'h2', 'h3', 'a'])
-            link_elem = article.find('a', href=True)
-            
-            if title_elem:
-                post = {
-                    "title": title_elem.get_text(strip=True) or 'Data Not Available',
-                    "link": link_elem['href'] if link_elem else url,
-                    "published": 'Data Not Available',
-                    "summary": article.get_text(strip=True)[:500] or 'Data Not Available',
-                    "author": 'Data Not Available',
-                    "source_url": url
-                }
-                posts.append(post)
+        futures = [executor.submit(parse_rss_feed, rss_url, url) for rss_url in rss_urls]
+        # Bound the whole probe stage, not just each socket read
+        for future in as_completed(futures, timeout=FETCH_TIMEOUT_SECONDS):
+            posts = future.result()
+            if posts:
+                return posts
+        raise LookupError(f"No RSS feed with posts found for {url}")
+    finally:
+        # Don't wait for the slower candidates once we have a result
+        executor.shutdown(wait=False, cancel_futures=True)
+
+# article/div elements whose class mentions post, article or entry (case-insensitive)
+ARTICLE_SELECTOR = ", ".join(
+    f"{tag}[class*={name} i]" for tag in ("article", "div") for name in ("post", "article", "entry")
+)
+
+def first_n_text(element, n: int) -> str:
+    """First n characters of an element's text, without materializing the whole text."""
+    parts = []
+    total = 0
+    for text in element.stripped_strings:
+        parts.append(text)
+        total += len(text) + 1
+        if total >= n:
+            break
+    return " ".join(parts)[:n]
+
+# Only build the parts of the page the scraper reads (articles, their containers, and the page title)
+SCRAPE_STRAINER = SoupStrainer(['title', 'main', 'article', 'div'])
+
+@st.cache_data(ttl=FETCH_CACHE_TTL_SECONDS, show_spinner=False)
+def scrape_web_page(url: str) -> List[Dict[str, Any]]:
+    """Fallback to web scraping if RSS fails. Fetch errors propagate to the caller."""
+    soup = BeautifulSoup(fetch_url(url, max_bytes=SCRAPE_MAX_BYTES), 'lxml', parse_only=SCRAPE_STRAINER)
+    
+    posts = []
+    # Try to find article/post links
+    article_links = soup.select(ARTICLE_SELECTOR, limit=10)
+    
+    for article in article_links:
+        title_elem = article.select_one('h1, h2, h3, a')
+        link_elem = article.select_one('a[href]')
         
-        if not posts:
-            # Fallback: create a single post from the page
-            title = soup.find('title')
-            posts.append({
-                "title": title.get_text(strip=True) if title else 'Data Not Available',
-                "link": url,
+        if title_elem:
+            post = {
+                "title": title_elem.get_text(strip=True) or 'Data Not Available',
+                "link": link_elem['href'] if link_elem else url,
                 "published": 'Data Not Available',
-                "summary": soup.get_text(strip=True)[:1000] or 'Data Not Available',
+                "summary": first_n_text(article, 500) or 'Data Not Available',
                 "author": 'Data Not Available',
                 "source_url": url
-            })
-        
-        return posts
-    except Exception as e:
-        return []
+            }
+            posts.append(post)
+    
+    if not posts:
+        # Fallback: create a single post from the page
+        posts.append({
+            "title": soup.title.get_text(strip=True) if soup.title else 'Data Not Available',
+            "link": url,
+            "published": 'Data Not Available',
+            "summary": first_n_text(soup, 1000) or 'Data Not Available',
+            "author": 'Data Not Available',
+            "source_url": url
+        })
+    
+    return posts
+
+@lru_cache(maxsize=4096)
+def parse_date(value: str) -> datetime:
+    """Parse a published date, trying the fast ISO-8601 path before dateutil."""
+    try:
+        return datetime.fromisoformat(value[:-1] + "+00:00" if value.endswith("Z") else value)
+    except ValueError:
+        return date_parser.parse(value)
 
 def filter_by_time_window(posts: List[Dict[str, Any]], days: int) -> List[Dict[str, Any]]:
     """Filter posts by time window."""
@@ -287,7 +557,7 @@ def filter_by_time_window(posts: List[Dict[str, Any]], days: int) -> List[Dict[s
     for post in posts:
         try:
             if post.get('published') and post['published'] != 'Data Not Available':
-                pub_date = date_parser.parse(post['published'])
+                pub_date = parse_date(post['published'])
                 if pub_date >= cutoff_date:
                     filtered.append(post)
             else:
@@ -299,43 +569,326 @@ def filter_by_time_window(posts: List[Dict[str, Any]], days: int) -> List[Dict[s
     
     return filtered
 
-# Agent 1: Fetcher Agent
-def fetcher_agent(state: NewsletterState) -> NewsletterState:
-    """Fetches posts from newsletter sources."""
-    st.info("🔍 Fetching posts from newsletter sources...")
-    fetch_start = time.time()
+def fetch_source(source_url: str, time_window: int, max_items: int) -> List[Dict[str, Any]]:
+    """Fetch posts for one source: RSS first, then scraping, filtered and limited."""
+    try:
+        posts = try_rss_feed(source_url)
+    except Exception:
+        # Includes the as_completed TimeoutError: fall back to scraping
+        posts = []
+    
+    if not posts:
+        try:
+            posts = scrape_web_page(source_url)
+        except Exception:
+            posts = []
+    
+    if not posts:
+        return []
+    
+    # Filter by time window
+    filtered_posts = filter_by_time_window(posts, time_window)
+    # Limit items per source
+    return filtered_posts[:max_items]
+
+# Helper Functions for Embeddings
+TIMEOUT_ERROR_TYPES = (APITimeoutError, httpx.TimeoutException, TimeoutError)
+
+def is_timeout_error(error: Exception) -> bool:
+    """Check whether an error is a client-side timeout, or its message looks like a timeout / deadline error."""
+    if isinstance(error, TIMEOUT_ERROR_TYPES):
+        return True
+    error_str = str(error).lower()
+    return "504" in error_str or "deadline" in error_str or "timeout" in error_str or "timed out" in error_str
+
+class RateLimiter:
+    """Thread-safe token bucket allowing `rate` acquisitions per `period` seconds."""
+    
+    def __init__(self, rate: int, period: float):
+        self.capacity = rate
+        self.tokens = float(rate)
+        self.fill_rate = rate / period
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self) -> float:
+        """Block until a token is available. Returns the seconds spent waiting."""
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.fill_rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) / self.fill_rate
+            time.sleep(delay)
+            waited += delay
+
+@st.cache_resource
+def get_embedding_rate_limiter() -> RateLimiter:
+    """Process-wide limiter for embeddings requests."""
+    return RateLimiter(EMBED_REQUESTS_PER_MINUTE, 60)
+
+def retry_delay(error: Exception, attempt: int):
+    """Seconds to wait before retrying a failed API call, or None if it should not be retried.
+    Only rate limits (429), server errors (5xx) and timeouts are retried; Retry-After is honored."""
+    response = getattr(error, "response", None)
+    status = getattr(error, "status_code", None) or getattr(response, "status_code", None)
+    if not (status == 429 or (status and status >= 500) or is_timeout_error(error)):
+        return None
+    retry_after = (getattr(response, "headers", None) or {}).get("retry-after")
+    try:
+        return min(float(retry_after), 60)
+    except (TypeError, ValueError):
+        # Exponential backoff: 2^attempt seconds
+        return min(2 ** attempt, 10)  # Cap at 10 seconds
+
+def embed_batch(embedding_model, batch: List[str], limiter: RateLimiter, max_retries: int = 5):
+    """Embed one chunk of texts, paced by the rate limiter and retried on transient errors.
+    Runs in worker threads, so it must not call Streamlit.
+    Returns: (embeddings, None) on success or (None, error message) on failure."""
+    # Small jitter so concurrent chunks don't hit the endpoint in lockstep
+    time.sleep(random.uniform(0, 0.2))
+    error_str = ""
+    for attempt in range(max_retries):
+        waited = limiter.acquire()
+        if waited > 0:
+            debug_log("debug-session", "pipeline", "A", "app.py:embed_batch:rate_limit", "rate limiter wait", {
+                "wait_sec": round(waited, 2)
+            })
+        try:
+            return embedding_model.embed_documents(batch), None
+        except Exception as embed_error:
+            error_str = str(embed_error)
+            if is_timeout_error(embed_error) and len(batch) > 1:
+                # A large chunk timed out: retry it as two smaller requests instead of resending it whole
+                mid = len(batch) // 2
+                head, error_str = embed_batch(embedding_model, batch[:mid], limiter, max_retries)
+                if head is None:
+                    return None, error_str
+                tail, error_str = embed_batch(embedding_model, batch[mid:], limiter, max_retries)
+                if tail is None:
+                    return None, error_str
+                return head + tail, None
+            delay = retry_delay(embed_error, attempt + 1)
+            if delay is None or attempt == max_retries - 1:
+                break
+            time.sleep(delay)
+    return None, error_str
+
+def cosine_similarity_matrix(embeddings: np.ndarray) -> np.ndarray:
+    """Pairwise cosine similarities via one matrix product over L2-normalized rows."""
+    E = np.asarray(embeddings, dtype=np.float32)
+    E = E / np.linalg.norm(E, axis=1, keepdims=True)
+    return E @ E.T
+
+def cluster_embeddings(similarities: np.ndarray) -> List[int]:
+    """Cluster posts by cosine distance (average linkage). Returns one label per row."""
+    distances = np.clip(1 - similarities, 0, None)
+    return AgglomerativeClustering(
+        n_clusters=None,
+        distance_threshold=CLUSTER_DISTANCE_THRESHOLD,
+        metric="precomputed",
+        linkage="average"
+    ).fit_predict(distances).tolist()
+
+def nearest_neighbors(similarities: np.ndarray, k: int) -> List[List[int]]:
+    """Top-k most similar other rows for each row, most similar first."""
+    sims = similarities.copy()
+    np.fill_diagonal(sims, -np.inf)
+    k = min(k, len(sims) - 1)
+    top = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(sims, top, axis=1), axis=1)
+    return np.take_along_axis(top, order, axis=1).tolist()
+
+def as_score(value) -> float:
+    """Numeric LLM score, or 0 when the field is missing or not a number (booleans included)."""
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return 0.0
+    return float(value)
+
+def trendiness_order(topics: List[Dict[str, Any]]) -> np.ndarray:
+    """Topic indices by descending LLM trendiness_score, sorted in one vectorized pass."""
+    scores = np.fromiter((as_score(t.get("trendiness_score")) for t in topics), dtype=np.float64, count=len(topics))
+    return np.argsort(-np.nan_to_num(scores), kind="stable")
+
+def content_hash(text: str) -> str:
+    """Stable cache key for an embedding input.
+    Includes the model name and size so vectors from a different embedding setup are never reused."""
+    return hashlib.sha256(f"{EMBEDDING_MODEL}:{EMBEDDING_DIM}\n{text}".encode("utf-8")).hexdigest()
+
+@st.cache_resource
+def get_embedding_cache() -> "OrderedDict[str, List[float]]":
+    """Process-wide LRU of content hash -> embedding, shared across reruns."""
+    return OrderedDict()
+
+@st.cache_resource
+def get_embedding_cache_lock() -> threading.Lock:
+    """Guards the embedding LRU, which concurrent sessions read and evict from."""
+    return threading.Lock()
+
+def remember_embedding(key: str, embedding: List[float]):
+    """Add an embedding to the in-process LRU, evicting the oldest entries."""
+    cache = get_embedding_cache()
+    with get_embedding_cache_lock():
+        cache[key] = embedding
+        cache.move_to_end(key)
+        while len(cache) > EMBEDDING_CACHE_SIZE:
+            cache.popitem(last=False)
+
+def lookup_cached_embeddings(hashes: List[str], db) -> Dict[str, List[float]]:
+    """Return already-known embeddings for the given content hashes.
+    Checks the in-process LRU first, then points stored in Qdrant by earlier runs."""
+    cache = get_embedding_cache()
+    found = {}
+    with get_embedding_cache_lock():
+        for key in hashes:
+            embedding = cache.get(key)
+            if embedding is not None:
+                cache.move_to_end(key)
+                found[key] = embedding
+    
+    missing = {key for key in hashes if key not in found}
+    if missing and db is not None:
+        try:
+            # The same content can be stored more than once, so page until every hash is resolved
+            offset = None
+            while True:
+                points, offset = db.client.scroll(
+                    collection_name=db.collection_name,
+                    scroll_filter=Filter(must=[FieldCondition(key="metadata.content_hash", match=MatchAny(any=list(missing)))]),
+                    limit=len(missing),
+                    offset=offset,
+                    with_payload=True,
+                    with_vectors=True
+                )
+                for point in points:
+                    key = (point.payload or {}).get("metadata", {}).get("content_hash")
+                    if key in missing and isinstance(point.vector, list):
+                        found[key] = point.vector
+                        missing.discard(key)
+                        remember_embedding(key, point.vector)
+                if not missing or offset is None:
+                    break
+        except Exception:
+            # The cache is best-effort; fall back to embedding everything
+            pass
+    return found
+
+def upsert_points(db, points: List[PointStruct]):
+    """Upload precomputed points in batches without waiting for Qdrant to persist each one."""
+    # Single process: a run stores at most a few hundred points, less than worker start-up would cost
+    db.client.upload_points(
+        collection_name=db.collection_name,
+        points=points,
+        batch_size=QDRANT_UPSERT_BATCH_SIZE,
+        max_retries=3,
+        wait=False
+    )
+
+@st.cache_resource
+def get_store_executor() -> ThreadPoolExecutor:
+    """Single background writer for vector store uploads, shared across reruns."""
+    return ThreadPoolExecutor(max_workers=1, thread_name_prefix="qdrant-store")
+
+def log_store_failure(future):
+    """Done-callback recording uploads that failed after the pipeline moved on."""
+    if future.exception() is not None:
+        debug_log("debug-session", "pipeline", "A", "app.py:store:error", "background store failed", {
+            "error": str(future.exception())[:200]
+        })
+
+def store_points_in_background(db, points: List[PointStruct]):
+    """Queue the upload on the background writer and return its future without waiting.
+    Nothing in the current run reads these points back, so the pipeline never blocks on it."""
+    future = get_store_executor().submit(upsert_points, db, points)
+    future.add_done_callback(log_store_failure)
+    return future
+
+def report_background_store(future, count: int):
+    """Report a background upload's outcome if it has already finished; never waits for it."""
+    if future is None:
+        return
+    if not future.done():
+        st.info(f"💾 Storing {count} embeddings in the vector database in the background")
+        return
+    try:
+        future.result()
+        st.success(f"✅ {count} embeddings stored in vector database")
+    except Exception as db_error:
+        st.warning(f"⚠️ Could not store embeddings in database: {str(db_error)}")
+
+# Agent 1: Fetcher Agent (fanned out: one task per source)
+class SourceFetchState(TypedDict):
+    source_url: str
+    config: Dict[str, Any]
+
+def dispatch_sources(state: NewsletterState) -> List[Send]:
+    """Start one fetcher task per source; LangGraph runs them in parallel."""
     debug_log("debug-session", "pipeline", "F", "app.py:fetcher:start", "fetcher start", {
         "sources": len(SOURCES_ALLOWLIST),
         "config": state.get("config", {})
     })
     config = state.get("config", {})
+    return [Send("fetcher", {"source_url": source_url, "config": config}) for source_url in SOURCES_ALLOWLIST]
+
+def fetcher_agent(state: SourceFetchState) -> Dict[str, Any]:
+    """Fetches posts from one newsletter source."""
+    fetch_start = time.time()
+    config = state.get("config", {})
     time_window = config.get("time_window_days", 14)
     max_items = config.get("max_items_per_source", 10)
     
-    all_posts = []
+    posts = fetch_source(state["source_url"], time_window, max_items)
     
-    for source_url in SOURCES_ALLOWLIST:
-        posts = try_rss_feed(source_url)
-        
-        if not posts:
-            posts = scrape_web_page(source_url)
-        
-        if posts:
-            # Filter by time window
-            filtered_posts = filter_by_time_window(posts, time_window)
-            # Limit items per source
-            filtered_posts = filtered_posts[:max_items]
-            all_posts.extend(filtered_posts)
-    
-    result = {
-        **state,
-        "raw_posts": all_posts
-    }
     debug_log("debug-session", "pipeline", "F", "app.py:fetcher:end", "fetcher end", {
-        "total_posts": len(all_posts),
+        "source": state["source_url"],
+        "total_posts": len(posts),
         "elapsed_sec": round(time.time() - fetch_start, 2)
     })
-    return result
+    # raw_posts has an add reducer, so each source's posts are appended to the shared list
+    return {"raw_posts": posts}
+
+def build_sources(raw_posts: List[Dict[str, Any]]) -> Dict[int, str]:
+    """Number each distinct source URL in order of first appearance (citation -> URL)."""
+    sources = {}
+    seen = set()
+    for post in raw_posts:
+        source_url = post.get("source_url", "")
+        if source_url and source_url not in seen:
+            seen.add(source_url)
+            sources[len(sources) + 1] = source_url
+    return sources
+
+WORD_PATTERN = re.compile(r"\w+")
+
+def dedupe_posts(raw_posts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Drop near-duplicate posts (e.g. the same article syndicated by several sources).
+    Exact copies are caught by a blake2b digest first; the rest go through MinHash LSH over
+    title + summary words. The first occurrence of each article is kept."""
+    lsh = MinHashLSH(threshold=DEDUP_JACCARD_THRESHOLD, num_perm=DEDUP_NUM_PERM)
+    seen_digests = set()
+    kept = []
+    for i, post in enumerate(raw_posts):
+        digest = hashlib.blake2b(
+            f"{post.get('title', '').lower().strip()}\n{post.get('summary', '')[:200]}".encode("utf-8"), digest_size=16
+        ).digest()
+        if digest in seen_digests:
+            continue
+        seen_digests.add(digest)
+        words = set(WORD_PATTERN.findall(f"{post.get('title', '')} {post.get('summary', '')[:500]}".lower()))
+        if not words:
+            kept.append(post)
+            continue
+        signature = MinHash(num_perm=DEDUP_NUM_PERM)
+        signature.update_batch([word.encode("utf-8") for word in words])
+        if lsh.query(signature):
+            continue
+        lsh.insert(str(i), signature)
+        kept.append(post)
+    return kept
 
 # Agent 2: Analysis Agent (Combined: Metadata + Themes + Ranking)
 class PostMetadata(BaseModel):
@@ -362,6 +915,51 @@ class RankedTopic(BaseModel):
     salience: float = Field(description="Salience score (0-1)")
     post_indices: List[int] = Field(description="Indices of posts related to this topic")
 
+# Per-post block of the analysis prompt (bound once, reused for every post)
+ANALYSIS_POST_FORMAT = "Post {n}:\nTitle: {title}\nLink: {link}\nPublished: {published}\nSummary: {summary}\nAuthor: {author}".format
+
+def render_analysis_post(n: int, post: Dict[str, Any]) -> str:
+    """One post as it appears in the analysis prompt."""
+    return ANALYSIS_POST_FORMAT(
+        n=n,
+        title=post.get('title', 'N/A'),
+        link=post.get('link', 'N/A'),
+        published=post.get('published', 'N/A'),
+        summary=post.get('summary', 'N/A')[:500],
+        author=post.get('author', 'N/A')
+    )
+
+@st.cache_resource(show_spinner=False)
+def get_token_encoder():
+    """tiktoken encoding of the chat model, loaded once."""
+    return tiktoken.encoding_for_model(CHAT_MODEL)
+
+def published_timestamp(post: Dict[str, Any]) -> float:
+    """Post date as a sort key; undated or unparseable posts sort last."""
+    try:
+        return parse_date(post['published']).timestamp()
+    except Exception:
+        return float("-inf")
+
+def fit_posts_to_budget(raw_posts: List[Dict[str, Any]], budget: int) -> List[Dict[str, Any]]:
+    """Keep the most recent posts whose prompt text fits in `budget` tokens, in their original order."""
+    rendered = [render_analysis_post(i + 1, post) for i, post in enumerate(raw_posts)]
+    try:
+        costs = [len(tokens) for tokens in get_token_encoder().encode_ordinary_batch(rendered)]
+    except Exception:
+        # Encoding files unavailable (e.g. offline): ~4 characters per token is close enough for a budget
+        costs = [len(text) // 4 + 1 for text in rendered]
+    if sum(costs) <= budget:
+        return raw_posts
+    keep = []
+    used = 0
+    for i in sorted(range(len(raw_posts)), key=lambda i: published_timestamp(raw_posts[i]), reverse=True):
+        if used + costs[i] > budget:
+            break
+        keep.append(i)
+        used += costs[i]
+    return [raw_posts[i] for i in sorted(keep)]
+
 class AnalysisResult(BaseModel):
     """Complete analysis result."""
     metadata: List[PostMetadata]
@@ -380,7 +978,6 @@ def analysis_agent(state: NewsletterState, embedding_model, db) -> NewsletterSta
     raw_posts = state.get("raw_posts", [])
     if not raw_posts:
         result = {
-            **state,
             "extracted_metadata": [],
             "themes": [],
             "ranked_topics": []
@@ -390,11 +987,21 @@ def analysis_agent(state: NewsletterState, embedding_model, db) -> NewsletterSta
         })
         return result
     
-    model = ChatOpenAI(
-        api_key=st.session_state.openai_api_key,
-        temperature=0,
-        model="gpt-4o-mini"
-    )
+    # Syndicated copies would cost embeddings and prompt tokens without adding signal
+    unique_posts = dedupe_posts(raw_posts)
+    if len(unique_posts) < len(raw_posts):
+        st.info(f"ℹ️ Skipped {len(raw_posts) - len(unique_posts)} near-duplicate posts")
+    raw_posts = unique_posts
+    
+    # Trim before embedding so post indices stay aligned across embeddings, hints and the LLM response
+    budgeted_posts = fit_posts_to_budget(raw_posts, ANALYSIS_TOKEN_BUDGET)
+    if len(budgeted_posts) < len(raw_posts):
+        st.info(f"ℹ️ Analyzing the {len(budgeted_posts)} most recent posts to stay within the prompt budget")
+    raw_posts = budgeted_posts
+    
+    model = get_chat_model(st.session_state.openai_api_key)
+    store_future = None
+    stored_count = 0
     
     try:
         # Check if embeddings are available
@@ -412,125 +1019,145 @@ def analysis_agent(state: NewsletterState, embedding_model, db) -> NewsletterSta
         valid_indices = None  # Track which original post indices have valid embeddings
         
         if use_embeddings and post_texts:  # Only try embeddings if model is available and we have posts
-            st.info(f"🔄 Generating embeddings for {len(post_texts)} posts...")
-            # Process one at a time to avoid timeout issues
-            batch_size = 1
-            all_embeddings = []
+            # One placeholder updated in place for all embedding progress messages
+            progress_placeholder = st.empty()
+            progress_placeholder.info(f"🔄 Generating embeddings for {len(post_texts)} posts...")
+            # Reuse embeddings of posts seen in earlier runs (keyed by content hash); only embed the misses
+            content_hashes = [content_hash(text) for text in post_texts]
+            cached_embeddings = lookup_cached_embeddings(content_hashes, db)
+            miss_indices = [idx for idx, h in enumerate(content_hashes) if h not in cached_embeddings]
+            if cached_embeddings:
+                progress_placeholder.info(f"♻️ Reusing {len(post_texts) - len(miss_indices)} cached embeddings, embedding {len(miss_indices)} new posts...")
+            
+            # Embed in chunks: the embeddings endpoint accepts arrays, so one request covers many posts.
+            # Chunks are sent concurrently; executor.map keeps results in chunk order.
+            miss_texts = [post_texts[idx] for idx in miss_indices]
+            chunks = [miss_texts[i:i+EMBED_BATCH_SIZE] for i in range(0, len(miss_texts), EMBED_BATCH_SIZE)]
+            # One contiguous float32 matrix; rows stay NaN until their embedding arrives, keeping index alignment
+            all_embeddings = np.full((len(post_texts), EMBEDDING_DIM), np.nan, dtype=np.float32)
+            for idx, h in enumerate(content_hashes):
+                if h in cached_embeddings:
+                    all_embeddings[idx] = cached_embeddings[h]
             failed_indices = []
+            last_error = ""
+            last_update = time.monotonic()
             
-            for i in range(0, len(post_texts), batch_size):
-                batch = post_texts[i:i+batch_size]
-                batch_success = False
-                
-                # Retry logic for each individual batch
-                for attempt in range(max_retries):
-                    try:
-                        # Exponential backoff: 2^attempt seconds
-                        if attempt > 0:
-                            wait_time = min(2 ** attempt, 10)  # Cap at 10 seconds
-                            st.info(f"⏳ Waiting {wait_time}s before retry...")
-                            time.sleep(wait_time)
-                        
-                        # Generate embedding for this batch
-                        batch_embeddings = embedding_model.embed_documents(batch)
-                        all_embeddings.extend(batch_embeddings)
-                        batch_success = True
-                        
-                        # Small delay between successful batches to avoid rate limiting
-                        if i + batch_size < len(post_texts):
-                            time.sleep(0.5)
-                        break
-                        
-                    except Exception as embed_error:
-                        error_str = str(embed_error)
-                        if "504" in error_str or "Deadline" in error_str or "timeout" in error_str.lower():
-                            if attempt < max_retries - 1:
-                                st.warning(f"⏱️ Timeout for batch {i//batch_size + 1}/{len(post_texts)//batch_size + 1} (attempt {attempt + 1}/{max_retries})")
-                                continue
-                            else:
-                                st.warning(f"⚠️ Failed to embed batch {i//batch_size + 1} after {max_retries} attempts. Skipping...")
-                                failed_indices.append(i)
-                                # Add None placeholder to maintain index alignment
-                                all_embeddings.append(None)
-                                break
-                        else:
-                            # Non-timeout error, log and skip
-                            st.warning(f"⚠️ Embedding error for batch {i//batch_size + 1}: {error_str[:100]}. Skipping...")
-                            failed_indices.append(i)
-                            all_embeddings.append(None)
-                            break
-                
-                # Update progress
-                if (i // batch_size + 1) % 5 == 0 or i + batch_size >= len(post_texts):
-                    progress = min(100, int((i + batch_size) / len(post_texts) * 100))
-                    st.info(f"📊 Embedding progress: {progress}% ({i + batch_size}/{len(post_texts)})")
+            limiter = get_embedding_rate_limiter()
+            with ThreadPoolExecutor(max_workers=EMBED_MAX_WORKERS) as executor:
+                results = executor.map(lambda chunk: embed_batch(embedding_model, chunk, limiter, max_retries), chunks)
+                for batch_num, (batch_embeddings, error_str) in enumerate(results, start=1):
+                    chunk_indices = miss_indices[(batch_num - 1) * EMBED_BATCH_SIZE:batch_num * EMBED_BATCH_SIZE]
+                    if batch_embeddings is None:
+                        # Every post in the failing chunk keeps its NaN row
+                        failed_indices.extend(chunk_indices)
+                        last_error = error_str
+                    else:
+                        all_embeddings[chunk_indices] = batch_embeddings
+                        for idx, embedding in zip(chunk_indices, batch_embeddings):
+                            remember_embedding(content_hashes[idx], embedding)
+                    
+                    # Throttle progress updates to at most one per second
+                    if time.monotonic() - last_update > 1.0:
+                        done = min(batch_num * EMBED_BATCH_SIZE, len(miss_texts))
+                        progress_placeholder.info(f"📊 Embedding progress: {done}/{len(miss_texts)} new posts")
+                        last_update = time.monotonic()
             
-            # Filter out None values (failed embeddings)
-            if None in all_embeddings:
-                st.warning(f"⚠️ {len(failed_indices)} out of {len(post_texts)} embeddings failed. Continuing with available embeddings.")
-                # Remove None values and corresponding post_texts
-                valid_embeddings = []
-                valid_indices = []
-                for idx, emb in enumerate(all_embeddings):
-                    if emb is not None:
-                        valid_embeddings.append(emb)
-                        valid_indices.append(idx)
+            # Filter out NaN rows (failed embeddings)
+            valid_mask = ~np.isnan(all_embeddings).any(axis=1)
+            if not valid_mask.all():
+                # Failures go into the final message of the placeholder, so later updates don't hide them
+                failure_note = f"{len(failed_indices)} out of {len(post_texts)} embeddings failed ({last_error[:100]})"
+                # Remove failed rows and corresponding post_texts
+                valid_embeddings = all_embeddings[valid_mask]
+                valid_indices = np.flatnonzero(valid_mask).tolist()
                 
                 if len(valid_embeddings) == 0:
-                    st.warning("⚠️ All embeddings failed. Continuing without embeddings for clustering.")
+                    progress_placeholder.warning(f"⚠️ All embeddings failed: {failure_note}. Continuing without embeddings for clustering.")
                     use_embeddings = False
                     valid_indices = None
                 else:
                     embeddings = valid_embeddings
                     # Update post_texts to match valid embeddings
                     post_texts = [post_texts[i] for i in valid_indices]
-                    st.success(f"✅ Successfully generated {len(valid_embeddings)}/{len(all_embeddings)} embeddings")
+                    progress_placeholder.warning(f"⚠️ Generated {len(valid_embeddings)}/{len(all_embeddings)} embeddings; {failure_note}. Continuing with available embeddings.")
             else:
                 embeddings = all_embeddings
                 valid_indices = list(range(len(post_texts)))  # All indices are valid
-                st.success(f"✅ Successfully generated all {len(embeddings)} embeddings")
+                progress_placeholder.success(f"✅ Successfully generated all {len(embeddings)} embeddings")
+        
+        # Cluster locally: one cosine-similarity matrix instead of round trips to the vector DB
+        semantic_clusters = ""
+        semantic_neighbors = ""
+        if use_embeddings and embeddings is not None and valid_indices is not None and len(embeddings) > 1:
+            try:
+                similarities = cosine_similarity_matrix(embeddings)
+                labels = cluster_embeddings(similarities)
+                groups = {}
+                for original_idx, label in zip(valid_indices, labels):
+                    groups.setdefault(label, []).append(original_idx)
+                # Hints use bare 0-based indices (like post_indices in the response), never the "Post N" labels
+                semantic_clusters = "\n".join(
+                    f"- Cluster {n + 1}: {indices}"
+                    for n, indices in enumerate(sorted((g for g in groups.values() if len(g) > 1), key=len, reverse=True))
+                )
+                # Precomputed neighbor lists replace per-post similarity queries against the vector DB
+                semantic_neighbors = "\n".join(
+                    f"- {valid_indices[row]}: {[valid_indices[j] for j in neighbors]}"
+                    for row, neighbors in enumerate(nearest_neighbors(similarities, NEIGHBOR_K))
+                )
+            except Exception as cluster_error:
+                st.warning(f"⚠️ Semantic clustering failed: {str(cluster_error)[:100]}. Continuing with LLM-only clustering.")
         
         # Store in vector DB for semantic search (only if embeddings succeeded)
-        if use_embeddings and embeddings and len(embeddings) > 0 and valid_indices is not None:
+        if use_embeddings and embeddings is not None and len(embeddings) > 0 and valid_indices is not None:
             try:
-                from langchain_core.documents import Document
-                # Map embeddings back to original raw_posts using valid_indices
-                docs = []
+                # Write the vectors we already have straight to Qdrant; db.add_documents would re-embed every text
+                points = []
                 for idx, text in enumerate(post_texts):
                     # valid_indices maps embedding index to original post_texts index
                     # Since post_texts was created from raw_posts, the index is the same
                     original_idx = valid_indices[idx] if idx < len(valid_indices) else idx
-                    if original_idx < len(raw_posts):
-                        doc = Document(
-                            page_content=text, 
-                            metadata={
-                                "index": original_idx, 
-                                "source": raw_posts[original_idx].get("source_url", ""), 
-                                "title": raw_posts[original_idx].get("title", "")
+                    # Posts whose embedding came from the cache are already stored
+                    if original_idx < len(raw_posts) and content_hashes[original_idx] not in cached_embeddings:
+                        points.append(PointStruct(
+                            id=str(uuid4()),
+                            vector=embeddings[idx].tolist(),
+                            payload={
+                                db.content_payload_key: text,
+                                db.metadata_payload_key: {
+                                    "index": original_idx, 
+                                    "source": raw_posts[original_idx].get("source_url", ""), 
+                                    "title": raw_posts[original_idx].get("title", ""),
+                                    "content_hash": content_hashes[original_idx]
+                                }
                             }
-                        )
-                        docs.append(doc)
+                        ))
                 
-                if docs:
-                    uuids = [str(uuid4()) for _ in range(len(docs))]
-                    db.add_documents(documents=docs, ids=uuids)
-                    st.success(f"✅ {len(docs)} embeddings stored in vector database")
+                if points:
+                    # Fire-and-forget: the upload runs alongside the LLM call and the rest of the pipeline
+                    store_future = store_points_in_background(db, points)
+                    stored_count = len(points)
             except Exception as db_error:
                 st.warning(f"⚠️ Could not store embeddings in database: {str(db_error)}. Continuing with LLM-only analysis.")
                 use_embeddings = False
         
         # Prepare posts text for LLM analysis
-        posts_text = "\n\n".join([
-            f"Post {i+1}:\nTitle: {p.get('title', 'N/A')}\nLink: {p.get('link', 'N/A')}\nPublished: {p.get('published', 'N/A')}\nSummary: {p.get('summary', 'N/A')[:500]}\nAuthor: {p.get('author', 'N/A')}"
-            for i, p in enumerate(raw_posts)
-        ])
+        posts_text = "\n\n".join(render_analysis_post(i + 1, p) for i, p in enumerate(raw_posts))
+        
+        cluster_hint = ""
+        if semantic_clusters:
+            cluster_hint += f"""
+Semantic clusters precomputed from embeddings (0-based post indices, so index 0 is Post 1; use them as hints when grouping themes):
+{semantic_clusters}"""
+        if semantic_neighbors:
+            cluster_hint += f"""
+Most similar posts for each post, most similar first (0-based post index: [0-based neighbor indices]):
+{semantic_neighbors}"""
         
         # Combined analysis prompt (metadata extraction + theme identification + trend ranking)
+        # Static instructions come first so repeated runs share a cacheable prompt prefix
         analysis_prompt = f"""You are analyzing newsletter posts to extract metadata, identify themes, and rank trends.
 
-Posts to analyze:
-{posts_text}
-
 Return ONLY a JSON object with this exact structure (no extra text):
 {{
   "metadata": [{{"title": str, "date": str, "author": str, "summary": str, "url": str, "tags": [str]}}],
@@ -542,15 +1169,38 @@ Rules:
 - For missing data, write exactly "Data Not Available"
 - Keep tone objective and factual
 - Scores in range 0-1
+- recency: 0.8-1.0 if the related posts were published within the last 7 days, lower the older they are
 - post indices are 0-based into the provided posts list
 - Do not include any fields other than the ones specified above
-- Output must be valid JSON"""
+- Output must be valid JSON
+
+Posts to analyze:
+{posts_text}
+{cluster_hint}"""
+        
+        # Reuse the analysis of an identical prompt from an earlier run instead of calling the LLM again
+        analysis_cache_vector = None
+        prompt_key = None
+        cached_content = None
+        if db is not None and embeddings is not None:
+            try:
+                analysis_cache_vector = embedding_centroid(embeddings)
+                prompt_key = analysis_cache_key(analysis_prompt)
+                cached_content = lookup_cached_analysis(db.client, prompt_key)
+            except Exception:
+                analysis_cache_vector = None
+            if cached_content is not None:
+                st.info("♻️ Reusing a cached analysis for these posts")
         
         # Perform initial analysis (manual JSON parsing to avoid schema/tool conversion issues)
         try:
-            raw_response = model.invoke(analysis_prompt)
-            content = raw_response.content if hasattr(raw_response, "content") else str(raw_response)
-            parsed = json.loads(content)
+            if cached_content is not None:
+                content = cached_content
+            else:
+                # JSON mode: the API guarantees a single JSON object, so no prose or code fences to strip
+                raw_response = model.bind(response_format={"type": "json_object"}).invoke(analysis_prompt)
+                content = raw_response.content if hasattr(raw_response, "content") else str(raw_response)
+            parsed = orjson.loads(content)
             metadata_resp = parsed.get("metadata", [])
             themes_resp = parsed.get("themes", [])
             ranked_resp = parsed.get("ranked_topics", [])
@@ -558,30 +1208,27 @@ Rules:
             # Basic validation of types
             if not isinstance(metadata_resp, list) or not isinstance(themes_resp, list) or not isinstance(ranked_resp, list):
                 raise ValueError("Invalid analysis result structure")
+            if cached_content is None and analysis_cache_vector is not None:
+                store_cached_analysis(db.client, analysis_cache_vector, prompt_key, content)
         except Exception as analysis_error:
             st.error(f"Failed to perform initial analysis: {str(analysis_error)}")
             raise  # Re-raise to be caught by outer exception handler
         
         # No refinement step; use parsed JSON directly
         try:
-            ranked_topics_sorted = sorted(
-                ranked_resp,
-                key=lambda x: x.get("trendiness_score", 0),
-                reverse=True
-            )
+            ranked_topics = [topic for topic in ranked_resp if isinstance(topic, dict)]
+            ranked_topics_sorted = [ranked_topics[i] for i in trendiness_order(ranked_topics)]
         except Exception as sort_error:
             st.warning(f"⚠️ Error sorting ranked topics: {str(sort_error)}")
             ranked_topics_sorted = []
         
         # Build source mapping
-        sources = {}
-        for post in raw_posts:
-            source_url = post.get("source_url", "")
-            if source_url and source_url not in sources.values():
-                sources[len(sources) + 1] = source_url
+        sources = build_sources(raw_posts)
         
-        extracted_metadata = metadata_resp if isinstance(metadata_resp, list) else []
-        themes = themes_resp if isinstance(themes_resp, list) else []
+        # Both were validated as lists right after parsing
+        extracted_metadata = metadata_resp
+        themes = themes_resp
+        report_background_store(store_future, stored_count)
         
         debug_log("debug-session", "pipeline", "A", "app.py:analysis:end", "analysis end", {
             "metadata_count": len(extracted_metadata),
@@ -590,7 +1237,6 @@ Rules:
             "elapsed_sec": round(time.time() - analysis_start, 2)
         })
         return {
-            **state,
             "extracted_metadata": extracted_metadata,
             "themes": themes,
             "ranked_topics": ranked_topics_sorted,
@@ -603,15 +1249,11 @@ Rules:
             "error": str(e)[:200],
             "elapsed_sec": round(time.time() - analysis_start, 2)
         })
+        report_background_store(store_future, stored_count)
         # Build source mapping even on error
-        sources = {}
-        for post in raw_posts:
-            source_url = post.get("source_url", "")
-            if source_url and source_url not in sources.values():
-                sources[len(sources) + 1] = source_url
+        sources = build_sources(raw_posts)
         
         return {
-            **state,
             "extracted_metadata": [],
             "themes": [],
             "ranked_topics": [],
@@ -619,7 +1261,50 @@ Rules:
         }
 
 # Agent 3: Newsletter Generator Agent
-def newsletter_generator_agent(state: NewsletterState) -> NewsletterState:
+def url_host(url: str) -> str:
+    """Lower-cased host of a URL without a leading www., for matching posts to sources."""
+    return urlsplit(url).netloc.lower().removeprefix("www.")
+
+NEWSLETTER_POST_FORMAT = "Post [{citation}]:\nTitle: {title}\nURL: {url}\nSummary: {summary}".format_map
+
+# Static instructions go in the system message and the per-run data in the user message,
+# so every request shares the same prefix and the provider can serve it from its prompt cache
+NEWSLETTER_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", """Generate a newsletter draft focused on the top trending topic.
+
+Format exactly as follows:
+
+# [Headline - objective and specific]
+
+**TL;DR:** [One sentence summary, maximum 40 words]
+
+## Why it matters
+
+- [First reason]
+- [Second reason]
+- [Third reason]
+
+## Key developments
+
+- [First development] [{{citation}}]
+- [Second development] [{{citation}}]
+- [Additional developments with citations]
+
+Rules:
+- Do not hallucinate data. Use only information from the provided posts.
+- If data is unavailable, write exactly "Data Not Available".
+- Keep tone objective, factual, and non-opinionated.
+- Use citations [1], [2], etc. matching the citation numbers in the posts.
+- All tables must be valid Markdown.
+- Each key development must have a citation number in brackets.
+
+Generate the newsletter draft in Markdown format following the exact format above."""),
+    ("human", """Top Topic: {topic}
+Trendiness Score: {score}
+Related Posts with Citations: {posts}""")
+])
+
+def newsletter_generator_agent(state: NewsletterState, embedding_model=None, db=None) -> NewsletterState:
     """Generates formatted newsletter draft with citations."""
     st.info("✍️ Generating newsletter draft...")
     gen_start = time.time()
@@ -634,18 +1319,13 @@ def newsletter_generator_agent(state: NewsletterState) -> NewsletterState:
     
     if not ranked_topics:
         return {
-            **state,
             "newsletter_draft": "# Newsletter\n\nNo trending topics found in the specified time window."
         }
     
     # Get top trend
     top_topic = ranked_topics[0]
     
-    model = ChatOpenAI(
-        api_key=st.session_state.openai_api_key,
-        temperature=0,
-        model="gpt-4o-mini"
-    )
+    model = get_chat_model(st.session_state.openai_api_key)
     
     # Get posts related to top topic
     related_post_indices = top_topic.get("post_indices", [])
@@ -656,97 +1336,100 @@ def newsletter_generator_agent(state: NewsletterState) -> NewsletterState:
         related_posts = extracted_metadata[:5]  # Limit to top 5
     
     # Build source citations - map post URLs to citation numbers
+    # Hosts shared by several sources map to None and go through the prefix scan instead
+    host_to_citation = {}
+    for cit_num, source_url in sources.items():
+        host = url_host(source_url)
+        host_to_citation[host] = None if host in host_to_citation else cit_num
+    # Longest source URL first, so the most specific matching source wins
+    source_to_citation = {source_url: cit_num for cit_num, source_url in sources.items()}
+    sources_by_length = sorted(source_to_citation, key=len, reverse=True)
+    source_roots = {source_url.rstrip("/") for source_url in sources.values()}
+    # One pass: resolve each post's citation and build its prompt entry.
+    # An article URL seen before is the same article listed twice, so it is skipped rather than repeated in the prompt.
+    # Placeholders ("Data Not Available") and source homepages are shared by distinct posts: those posts are kept,
+    # reusing the citation already assigned to the URL.
     post_to_citation = {}
-    for post in related_posts:
-        post_url = post.get("url", "")
-        # Find matching source
-        matched = False
-        for cit_num, source_url in sources.items():
-            if source_url in post_url or post_url.startswith(source_url):
-                post_to_citation[post_url] = cit_num
-                matched = True
-                break
-        # If no match found, assign new citation
-        if not matched and post_url:
-            new_cit = len(sources) + 1
-            sources[new_cit] = post_url
-            post_to_citation[post_url] = new_cit
-    
-    # Prepare posts with citation numbers
     posts_with_citations = []
     for i, post in enumerate(related_posts):
         post_url = post.get("url", "")
-        citation_num = post_to_citation.get(post_url, i + 1)
+        citation_num = post_to_citation.get(post_url)
+        if citation_num is not None:
+            if post_url.startswith(("http://", "https://")) and post_url.rstrip("/") not in source_roots:
+                continue
+        elif post_url:
+            # Find matching source: one dict lookup by host, prefix scan only on a miss
+            citation_num = host_to_citation.get(url_host(post_url))
+            if citation_num is None:
+                matched_source = next((source_url for source_url in sources_by_length if post_url.startswith(source_url)), None)
+                if matched_source:
+                    citation_num = source_to_citation[matched_source]
+                else:
+                    # If no match found, assign new citation
+                    citation_num = len(sources) + 1
+                    sources[citation_num] = post_url
+            post_to_citation[post_url] = citation_num
         posts_with_citations.append({
-            "citation": citation_num,
+            "citation": citation_num if citation_num is not None else i + 1,
             "title": post.get("title", "Data Not Available"),
             "url": post_url,
             "summary": post.get("summary", "Data Not Available")
         })
     
-    newsletter_prompt = PromptTemplate(
-        template="""Generate a newsletter draft focused on the top trending topic.
-        
-        Top Topic: {topic}
-        Trendiness Score: {score}
-        Related Posts with Citations: {posts}
-        
-        Format exactly as follows:
-        
-        # [Headline - objective and specific]
-        
-        **TL;DR:** [One sentence summary, maximum 40 words]
-        
-        ## Why it matters
-        
-        - [First reason]
-        - [Second reason]
-        - [Third reason]
-        
-        ## Key developments
-        
-        - [First development] [{{citation}}]
-        - [Second development] [{{citation}}]
-        - [Additional developments with citations]
-        
-        Rules:
-        - Do not hallucinate data. Use only information from the provided posts.
-        - If data is unavailable, write exactly "Data Not Available".
-        - Keep tone objective, factual, and non-opinionated.
-        - Use citations [1], [2], etc. matching the citation numbers in the posts.
-        - All tables must be valid Markdown.
-        - Each key development must have a citation number in brackets.
-        
-        Generate the newsletter draft in Markdown format following the exact format above.""",
-        input_variables=["topic", "score", "posts"]
-    )
     
-    posts_text = "\n\n".join([
-        f"Post [{p['citation']}]:\nTitle: {p['title']}\nURL: {p['url']}\nSummary: {p['summary']}"
-        for p in posts_with_citations
-    ])
+    posts_text = "\n\n".join(map(NEWSLETTER_POST_FORMAT, posts_with_citations))
     
-    chain = newsletter_prompt | model | StrOutputParser()
+    chain = NEWSLETTER_PROMPT | model | StrOutputParser()
     
     try:
-        draft = chain.invoke({
+        # Reuse a recent draft for (nearly) the same topic and posts instead of calling the LLM again.
+        # Identical inputs hit the in-process exact cache first and skip the embedding call.
+        prompt_inputs = {
             "topic": top_topic.get("topic", "Data Not Available"),
             "score": top_topic.get("trendiness_score", 0),
             "posts": posts_text
-        })
+        }
+        exact_key = exact_draft_key(prompt_inputs)
+        cache_vector = None
+        draft = lookup_exact_draft(exact_key)
+        if draft is not None:
+            st.info("♻️ Reusing a cached draft for this topic")
+        elif embedding_model is not None and db is not None:
+            try:
+                cache_vector = embedding_model.embed_query(
+                    draft_cache_text(top_topic.get("topic", ""), [p["url"] for p in posts_with_citations])
+                )
+                draft = lookup_cached_draft(db.client, cache_vector, posts_text)
+            except Exception:
+                cache_vector = None
+            if draft is not None:
+                st.info("♻️ Reusing a cached draft for this topic")
+        
+        if draft is None:
+            # Stream tokens into a live preview; the final draft is rendered by main() once the pipeline ends
+            preview_placeholder = st.empty()
+            try:
+                draft = preview_placeholder.write_stream(chain.stream(prompt_inputs))
+            except Exception as stream_error:
+                # Streaming unsupported or interrupted: fall back to a single blocking call
+                debug_log("debug-session", "pipeline", "G", "app.py:generator:stream_fallback", "stream failed, using invoke", {
+                    "error": str(stream_error)[:200]
+                })
+                draft = chain.invoke(prompt_inputs)
+            preview_placeholder.empty()
+            if cache_vector is not None:
+                store_cached_draft(db.client, cache_vector, draft, top_topic.get("topic", ""), posts_text)
+        remember_exact_draft(exact_key, draft)
         
         # Add Sources section
-        sources_section = "\n\n## Sources\n\n"
-        for cit_num, source_url in sources.items():
-            sources_section += f"[{cit_num}] {source_url}\n"
+        sources_section = "".join(f"[{cit_num}] {source_url}\n" for cit_num, source_url in sources.items())
         
-        final_draft = draft + sources_section
+        final_draft = "".join((draft, "\n\n## Sources\n\n", sources_section))
         debug_log("debug-session", "pipeline", "G", "app.py:generator:end", "generator end", {
             "elapsed_sec": round(time.time() - gen_start, 2),
             "draft_length": len(final_draft)
         })
         return {
-            **state,
             "newsletter_draft": final_draft
         }
     except Exception as e:
@@ -756,11 +1439,144 @@ def newsletter_generator_agent(state: NewsletterState) -> NewsletterState:
             "elapsed_sec": round(time.time() - gen_start, 2)
         })
         return {
-            **state,
             "newsletter_draft": "# Newsletter\n\nError generating newsletter draft."
         }
 
+# Semantic response caches backed by small Qdrant collections (payload + created_at per point)
+def ensure_cache_collection(client, collection_name: str, embedding_dim: int):
+    """Create (or recreate on dimension change) a Qdrant collection backing a response cache."""
+    from qdrant_client.models import Distance, VectorParams
+    if client.collection_exists(collection_name):
+        existing_dim = client.get_collection(collection_name).config.params.vectors.size
+        if existing_dim == embedding_dim:
+            return
+        client.delete_collection(collection_name)
+    client.create_collection(
+        collection_name=collection_name,
+        vectors_config=VectorParams(size=embedding_dim, distance=Distance.COSINE),
+    )
+
+def lookup_cached_payload(client, collection_name: str, vector: List[float], threshold: float, ttl_seconds: float):
+    """Return the payload of the closest entry if it is similar enough and not expired, else None."""
+    hits = client.query_points(
+        collection_name=collection_name,
+        query=vector,
+        limit=1,
+        with_payload=True,
+        score_threshold=threshold
+    ).points
+    if hits and time.time() - hits[0].payload.get("created_at", 0) < ttl_seconds:
+        return hits[0].payload
+    return None
+
+def store_cached_payload(client, collection_name: str, vector: List[float], payload: Dict[str, Any], ttl_seconds: float,
+                         point_id: str = None):
+    """Store a cache entry and sweep expired ones (best-effort, never blocks the pipeline).
+    A fixed point_id overwrites the previous entry for the same key instead of adding another."""
+    from qdrant_client.models import FilterSelector, Range
+    try:
+        now = time.time()
+        client.upsert(
+            collection_name=collection_name,
+            points=[PointStruct(id=point_id or str(uuid4()), vector=vector, payload={**payload, "created_at": now})],
+            wait=False
+        )
+        client.delete(
+            collection_name=collection_name,
+            points_selector=FilterSelector(filter=Filter(must=[
+                FieldCondition(key="created_at", range=Range(lt=now - ttl_seconds))
+            ])),
+            wait=False
+        )
+    except Exception:
+        pass
+
+# Draft cache: drafts keyed by an embedding of (topic, related post URLs).
+# The draft's [n] citations refer to the posts it was generated from, so a hit is only used for the same rendered posts.
+def draft_cache_text(topic: str, urls: List[str]) -> str:
+    """Text embedded as the draft cache key."""
+    return topic + "|" + "|".join(sorted(urls))
+
+def lookup_cached_draft(client, vector: List[float], posts_text: str):
+    """Return a stored draft for the same posts whose key is similar enough and not expired, else None."""
+    payload = lookup_cached_payload(client, DRAFT_CACHE_COLLECTION, vector, DRAFT_CACHE_THRESHOLD, DRAFT_CACHE_TTL_SECONDS)
+    if payload and payload.get("posts") == posts_text:
+        return payload.get("draft")
+    return None
+
+def store_cached_draft(client, vector: List[float], draft: str, topic: str, posts_text: str):
+    """Store a generated draft along with the posts it cites."""
+    store_cached_payload(
+        client, DRAFT_CACHE_COLLECTION, vector, {"draft": draft, "topic": topic, "posts": posts_text}, DRAFT_CACHE_TTL_SECONDS
+    )
+
+@st.cache_resource
+def get_exact_draft_cache() -> "OrderedDict[str, tuple]":
+    """Process-wide LRU of prompt-input hash -> (draft, created_at), shared across reruns."""
+    return OrderedDict()
+
+@st.cache_resource
+def get_exact_draft_cache_lock() -> threading.Lock:
+    """Guards the exact draft LRU, which concurrent sessions read and evict from."""
+    return threading.Lock()
+
+def exact_draft_key(prompt_inputs: Dict[str, Any]) -> str:
+    """sha256 of the exact generator inputs."""
+    return hashlib.sha256(
+        f"{prompt_inputs['topic']}\n{prompt_inputs['score']}\n{prompt_inputs['posts']}".encode("utf-8")
+    ).hexdigest()
+
+def lookup_exact_draft(key: str):
+    """Return the draft generated from identical inputs if it has not expired, else None."""
+    with get_exact_draft_cache_lock():
+        entry = get_exact_draft_cache().get(key)
+    if entry and time.time() - entry[1] < DRAFT_CACHE_TTL_SECONDS:
+        return entry[0]
+    return None
+
+def remember_exact_draft(key: str, draft: str):
+    """Add a draft to the exact cache, evicting the oldest entries."""
+    cache = get_exact_draft_cache()
+    with get_exact_draft_cache_lock():
+        cache[key] = (draft, time.time())
+        cache.move_to_end(key)
+        while len(cache) > DRAFT_EXACT_CACHE_SIZE:
+            cache.popitem(last=False)
+
+# Analysis cache: raw LLM analysis JSON keyed by a hash of the exact analysis prompt.
+# The prompt carries every post field and the cluster hints, so any change to the inputs is a miss.
+def embedding_centroid(embeddings: np.ndarray) -> List[float]:
+    """L2-normalized mean of a set of embeddings (stored as the cache point's vector)."""
+    centroid = np.asarray(embeddings, dtype=np.float32).mean(axis=0)
+    return (centroid / np.linalg.norm(centroid)).tolist()
+
+def analysis_cache_key(analysis_prompt: str) -> str:
+    """sha256 of the chat model and the exact analysis prompt."""
+    return hashlib.sha256(f"{CHAT_MODEL}\n{analysis_prompt}".encode("utf-8")).hexdigest()
+
+def lookup_cached_analysis(client, prompt_key: str):
+    """Return the stored analysis response for the same prompt if it has not expired, else None."""
+    points, _ = client.scroll(
+        collection_name=ANALYSIS_CACHE_COLLECTION,
+        scroll_filter=Filter(must=[FieldCondition(key="prompt_key", match=MatchValue(value=prompt_key))]),
+        limit=1,
+        with_payload=True,
+        with_vectors=False
+    )
+    if points and time.time() - points[0].payload.get("created_at", 0) < ANALYSIS_CACHE_TTL_SECONDS:
+        return points[0].payload.get("response")
+    return None
+
+def store_cached_analysis(client, vector: List[float], prompt_key: str, response: str):
+    """Store a raw analysis response, one point per prompt key."""
+    store_cached_payload(
+        client, ANALYSIS_CACHE_COLLECTION, vector, {"prompt_key": prompt_key, "response": response},
+        ANALYSIS_CACHE_TTL_SECONDS, point_id=str(UUID(prompt_key[:32]))
+    )
+
 # Build LangGraph Workflow
+# Compiled once per (embedding model, vector store) pair instead of on every button click
+@st.cache_resource(show_spinner=False, max_entries=4, hash_funcs={OpenAIEmbeddings: id, QdrantVectorStore: id})
 def create_newsletter_graph(embedding_model, db):
     """Create the LangGraph workflow."""
     workflow = StateGraph(NewsletterState)
@@ -769,13 +1585,16 @@ def create_newsletter_graph(embedding_model, db):
     def analysis_wrapper(state: NewsletterState) -> NewsletterState:
         return analysis_agent(state, embedding_model, db)
     
+    def generator_wrapper(state: NewsletterState) -> NewsletterState:
+        return newsletter_generator_agent(state, embedding_model, db)
+    
     # Add nodes
     workflow.add_node("fetcher", fetcher_agent)
     workflow.add_node("analysis", analysis_wrapper)
-    workflow.add_node("generator", newsletter_generator_agent)
+    workflow.add_node("generator", generator_wrapper)
     
-    # Add edges
-    workflow.add_edge(START, "fetcher")
+    # Add edges: fan out one fetcher per source, then join into analysis
+    workflow.add_conditional_edges(START, dispatch_sources, ["fetcher"])
     workflow.add_edge("fetcher", "analysis")
     workflow.add_edge("analysis", "generator")
     workflow.add_edge("generator", END)
@@ -799,9 +1618,16 @@ def main():
             "use_embeddings": True
         }
     
-    embedding_model, client, db = initialize_components()
+    embedding_model, client, db = initialize_components(
+        st.session_state.qdrant_host,
+        st.session_state.qdrant_api_key,
+        st.session_state.openai_api_key,
+        st.session_state.config.get("use_embeddings", True)
+    )
     # Only require Qdrant client - embeddings are optional
     if client is None:
+        # Don't keep a failed connection cached; retry on the next rerun
+        initialize_components.clear()
         st.error("❌ Failed to connect to Qdrant. Please check your Qdrant configuration.")
         return
     
@@ -833,32 +1659,28 @@ def main():
         with st.spinner("Running newsletter pipeline..."):
             try:
                 final_state = None
-                for update in graph.stream(initial_state):
-                    # Handle different stream output shapes across langgraph versions
-                    if isinstance(update, tuple) and len(update) == 2:
-                        node_name, node_state = update
-                    elif isinstance(update, dict):
-                        node_name = update.get("event") or update.get("node") or update.get("name")
-                        # Heuristic: if newsletter_draft is present, treat as generator
-                        if not node_name and "newsletter_draft" in update:
-                            node_name = "generator"
-                        node_name = node_name or "unknown"
-                        node_state = update.get("state", update)
-                    else:
-                        node_name, node_state = "unknown", update
-
-                    final_state = node_state
-                    debug_log("debug-session", "pipeline", "P", "app.py:pipeline:node", "pipeline node", {
-                        "node": node_name,
-                        "elapsed_sec": round(time.time() - run_start, 2)
-                    })
-                    # Show progress
-                    if node_name == "fetcher":
-                        st.info("✅ Posts fetched")
-                    elif node_name == "analysis":
-                        st.info("✅ Analysis complete")
-                    elif node_name == "generator":
-                        st.info("✅ Newsletter generated")
+                shown_nodes = set()
+                # "updates" chunks name the node that just ran; "values" chunks carry the full merged state
+                for mode, chunk in graph.stream(initial_state, stream_mode=["updates", "values"]):
+                    if mode == "values":
+                        final_state = chunk
+                        continue
+                    
+                    for node_name in chunk:
+                        debug_log("debug-session", "pipeline", "P", "app.py:pipeline:node", "pipeline node", {
+                            "node": node_name,
+                            "elapsed_sec": round(time.time() - run_start, 2)
+                        })
+                        # Show progress (once per node; the fetcher runs once per source)
+                        if node_name in shown_nodes:
+                            continue
+                        shown_nodes.add(node_name)
+                        if node_name == "fetcher":
+                            st.info("✅ Posts fetched")
+                        elif node_name == "analysis":
+                            st.info("✅ Analysis complete")
+                        elif node_name == "generator":
+                            st.info("✅ Newsletter generated")
                 
                 if final_state and "newsletter_draft" in final_state:
                     newsletter_draft = final_state.get("newsletter_draft", "")
@@ -4,6 +4,7 @@ Defines three specialized agents: Research, Analysis, and Report
 """
 
 import logging
+import httpx
 from crewai import Agent
 from langchain_openai import ChatOpenAI
 import config
@@ -17,14 +18,28 @@ from tools import (
 
 logger = logging.getLogger(__name__)
 
+# One pooled HTTP client shared by every agent's LLM so TLS connections are reused.
+# The pinned langchain-openai (0.0.5) hands this client to both the sync and async OpenAI clients,
+# so these LLMs are sync-only: the crew runs via crew.kickoff() and tasks must not use async_execution or ainvoke.
+_http_client = httpx.Client(
+    limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+    timeout=60.0
+)
+_llm_cache = {}
+
 
 def create_llm(temperature: float = 0.7):
-    """Create and configure the LLM instance"""
-    return ChatOpenAI(
-        model=config.OPENAI_MODEL,
-        temperature=temperature,
-        api_key=config.OPENAI_API_KEY
-    )
+    """Create and configure the LLM instance (cached per temperature, sync calls only)"""
+    if temperature not in _llm_cache:
+        _llm_cache[temperature] = ChatOpenAI(
+            model=config.OPENAI_MODEL,
+            temperature=temperature,
+            api_key=config.OPENAI_API_KEY,
+            http_client=_http_client,
+            max_retries=2,
+            timeout=60
+        )
+    return _llm_cache[temperature]
 
 
 def create_research_agent(company_name: str, industry: str) -> Agent:
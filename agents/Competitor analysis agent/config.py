@@ -21,6 +21,8 @@ LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 MAX_COMPETITORS = int(os.getenv("MAX_COMPETITORS", "5"))
 DEFAULT_COMPETITORS = int(os.getenv("DEFAULT_COMPETITORS", "3"))
 ANALYSIS_DEPTH = os.getenv("ANALYSIS_DEPTH", "standard")
+SEARCH_CACHE_TTL_SECONDS = int(os.getenv("SEARCH_CACHE_TTL_SECONDS", "21600"))
+SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "512"))
 
 # Industry Categories
 INDUSTRIES = [
@@ -4,8 +4,11 @@ Includes SerpAPI wrapper and data processing utilities
 """
 
 import json
+import re
 import time
 import logging
+import threading
+from collections import OrderedDict
 from typing import Dict, List, Optional, Any
 from serpapi import GoogleSearch
 from crewai_tools import BaseTool
@@ -14,6 +17,51 @@ import config
 
 logger = logging.getLogger(__name__)
 
+# Search results cache shared by all tools: normalized params -> (timestamp, results)
+_search_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+_search_cache_lock = threading.Lock()
+search_cache_stats = {"hits": 0, "misses": 0}
+
+
+def _search_cache_key(params: Dict) -> tuple:
+    """Build a cache key from search params, ignoring the API key and query case/whitespace"""
+    return tuple(sorted(
+        (name, re.sub(r"\s+", " ", str(value).lower().strip()) if name == "q" else value)
+        for name, value in params.items()
+        if name != "api_key"
+    ))
+
+
+def cached_search(params: Dict) -> Dict:
+    """
+    Run a SerpAPI search, reusing results of an identical query made within the TTL
+    
+    Agents often repeat the same searches across tasks; each hit saves a full API round trip.
+    Error responses are never cached.
+    """
+    key = _search_cache_key(params)
+    now = time.time()
+    
+    with _search_cache_lock:
+        entry = _search_cache.get(key)
+        if entry and now - entry[0] < config.SEARCH_CACHE_TTL_SECONDS:
+            _search_cache.move_to_end(key)
+            search_cache_stats["hits"] += 1
+            logger.info(f"Search cache hit for: {params.get('q')} (stats: {search_cache_stats})")
+            return entry[1]
+        search_cache_stats["misses"] += 1
+    
+    results = GoogleSearch(params).get_dict()
+    
+    if "error" not in results:
+        with _search_cache_lock:
+            _search_cache[key] = (now, results)
+            _search_cache.move_to_end(key)
+            while len(_search_cache) > config.SEARCH_CACHE_MAX_ENTRIES:
+                _search_cache.popitem(last=False)
+    
+    return results
+
 
 class CompetitorSearchTool(BaseTool):
     """Tool for searching competitor information using SerpAPI"""
@@ -38,8 +86,7 @@ class CompetitorSearchTool(BaseTool):
                 "engine": "google"
             }
             
-            search = GoogleSearch(params)
-            results = search.get_dict()
+            results = cached_search(params)
             
             # Process results
             processed_results = self._process_search_results(results)
@@ -112,8 +159,7 @@ class CompanyInfoTool(BaseTool):
                 "engine": "google"
             }
             
-            search = GoogleSearch(params)
-            results = search.get_dict()
+            results = cached_search(params)
             
             # Extract company info
             company_info = self._extract_company_info(results, company_name)
@@ -182,8 +228,7 @@ class PricingSearchTool(BaseTool):
                 "num": 5
             }
             
-            search = GoogleSearch(params)
-            results = search.get_dict()
+            results = cached_search(params)
             
             # Extract pricing info
             pricing_info = self._extract_pricing_info(results, company_name)
@@ -245,8 +290,7 @@ class ReviewSearchTool(BaseTool):
                 "num": 5
             }
             
-            search = GoogleSearch(params)
-            results = search.get_dict()
+            results = cached_search(params)
             
             # Extract review info
             review_info = self._extract_review_info(results, company_name)